@@ -3,53 +3,159 @@ from tkinter import ttk
 from tkinter import messagebox
 from tkinter import simpledialog
 from openai import OpenAI
-import tiktoken
+import array
+import collections
+import concurrent.futures
+import functools
+import hashlib
 import os
+import pathlib
+import shutil
+import subprocess
 import sys
-try:
-    # Attempt to import necessary pywin32 modules
-    import win32gui
-    import win32con
-    import struct
-    # Flag to indicate if flashing is supported (Windows and pywin32 installed)
-    _FLASH_WINDOW_SUPPORTED = sys.platform == 'win32'
-except ImportError:
-    # If pywin32 is not installed, disable flashing
-    _FLASH_WINDOW_SUPPORTED = False
-    # Optional: Print a warning once at startup if you want
-    # print("Warning: 'pywin32' not installed. Taskbar flashing feature is disabled.")
-
-
-class _TokenCountResult:
-    def __init__(self, total_tokens: int):
-        self.total_tokens = total_tokens
-
-
-class _ModelsWrapper:
-    def __init__(self, encoding_getter):
-        self._get_encoding = encoding_getter
-
-    def count_tokens(self, model: str, contents) -> _TokenCountResult:
-        text = contents if isinstance(contents, str) else str(contents or "")
-        try:
-            encoding = self._get_encoding(model)
-            tokens = encoding.encode(text)
-            return _TokenCountResult(len(tokens))
-        except Exception:
-            # On any failure, return 0 tokens to keep UI robust
-            return _TokenCountResult(0)
+import threading
+
+# pywin32 modules for taskbar flashing; imported on first use by _try_import_win32()
+win32gui = None
+win32con = None
+
+# API key read from OpenAI_API_key.txt by _read_api_key_from_file(); None until a key was read successfully
+_cached_api_key = None
+
+# Maps our internal message roles to Responses API roles ('model' is the API's 'assistant')
+_ROLE_MAP = {"model": "assistant", "user": "user", "assistant": "assistant", "system": "system"}
+# Model name prefixes of model families that support the reasoning.effort parameter
+_REASONING_PREFIXES = ("gpt-5",)
+# Maximum number of entries in the GUI's (model, text digest) -> token count cache
+_TOKEN_CACHE_MAX = 1024
+# Number of messages inserted into the messages Treeview at a time; longer conversations are shown through a
+# window of this many rows that slides as the list is scrolled
+_TREEVIEW_WINDOW_SIZE = 200
+# Messages Treeview row text: number of message characters shown, the suffix marking cut text, and the
+# row prefix of each role
+_TRUNC = 20
+_ELLIPSIS = '...'
+_PREFIX = {'user': 'User: ', 'model': 'Model: '}
+# Texts at least this long (in characters) are copied to the clipboard with the OS clipboard API on a worker
+# thread instead of through Tk on the UI thread
+_CLIPBOARD_NATIVE_MIN = 64 * 1024
+# Accepted reasoning.effort values
+_VALID_EFFORTS = frozenset(("low", "medium", "high"))
+# Model name prefixes and substrings of models that use the o200k_base encoding when tiktoken doesn't know them
+_O200K_PREFIXES = ("o",)
+_O200K_HINTS = ("gpt-4o", "omni")
+
+# Dark theme colors
+_DARK_PALETTE = {
+    'BG': '#2E2E2E',
+    'FG': '#EAEAEA',
+    'SELECT_BG': '#4A4A4A',  # Background for selected items/hover
+    'SELECT_FG': '#FFFFFF',
+    'WIDGET_BG': '#3C3C3C',  # Background for widgets like buttons, entries
+    'TEXT_FG': '#FFFFFF',  # Text color for most widgets
+    'DISABLED_FG': '#777777',  # Color for disabled text/widgets
+    'TREEVIEW_HEADING_BG': '#3C3C3C',
+    'TREEVIEW_FIELD_BG': '#383838',  # Background of the treeview item area
+    'AI_MSG_BG': '#203A20',  # Dark green background for AI messages in Treeview
+}
+
+# ttk style name -> options for style.configure, applied in order (global '.' style first)
+_STYLE_TABLE = {
+    '.': dict(background=_DARK_PALETTE['BG'],
+              foreground=_DARK_PALETTE['FG'],
+              fieldbackground=_DARK_PALETTE['WIDGET_BG'],  # Default field bg
+              troughcolor=_DARK_PALETTE['BG']),  # Scrollbar trough
+    'TFrame': dict(background=_DARK_PALETTE['BG']),
+    'TLabel': dict(background=_DARK_PALETTE['BG'], foreground=_DARK_PALETTE['FG']),
+    'TButton': dict(background=_DARK_PALETTE['WIDGET_BG'], foreground=_DARK_PALETTE['TEXT_FG']),
+    'TCombobox': dict(fieldbackground=_DARK_PALETTE['WIDGET_BG'],
+                      background=_DARK_PALETTE['WIDGET_BG'],
+                      foreground=_DARK_PALETTE['TEXT_FG'],
+                      arrowcolor=_DARK_PALETTE['FG'],
+                      selectbackground=_DARK_PALETTE['SELECT_BG'],  # Selection color in dropdown
+                      selectforeground=_DARK_PALETTE['SELECT_FG']),
+    'Treeview': dict(background=_DARK_PALETTE['TREEVIEW_FIELD_BG'],
+                     foreground=_DARK_PALETTE['FG'],
+                     fieldbackground=_DARK_PALETTE['TREEVIEW_FIELD_BG'],  # Item area background
+                     rowheight=25),  # Adjust if needed
+    'Treeview.Heading': dict(background=_DARK_PALETTE['TREEVIEW_HEADING_BG'],
+                             foreground=_DARK_PALETTE['FG'],
+                             relief='flat'),
+    # PanedWindow sash (the divider)
+    'TPanedwindow': dict(background=_DARK_PALETTE['BG']),
+    'Sash': dict(background=_DARK_PALETTE['WIDGET_BG'], sashthickness=6, relief='raised'),
+}
+
+# ttk style name -> state-dependent options for style.map
+_STYLE_MAP_TABLE = {
+    'TButton': dict(background=[('active', _DARK_PALETTE['SELECT_BG']), ('disabled', _DARK_PALETTE['BG'])],
+                    foreground=[('active', _DARK_PALETTE['SELECT_FG']), ('disabled', _DARK_PALETTE['DISABLED_FG'])]),
+    # Map ensures hover/focus looks right if theme supports it
+    'TCombobox': dict(fieldbackground=[('readonly', _DARK_PALETTE['WIDGET_BG'])],
+                      selectbackground=[('readonly', _DARK_PALETTE['SELECT_BG'])],
+                      selectforeground=[('readonly', _DARK_PALETTE['SELECT_FG'])]),
+    'Treeview.Heading': dict(background=[('active', _DARK_PALETTE['SELECT_BG'])]),  # Hover/click on heading
+    # Treeview selection style
+    'Treeview': dict(background=[('selected', _DARK_PALETTE['SELECT_BG'])],
+                     foreground=[('selected', _DARK_PALETTE['SELECT_FG'])]),
+}
+
+
+@functools.lru_cache(maxsize=1)
+def _try_import_win32():
+    """
+    Imports the pywin32 modules needed for taskbar flashing the first time they are needed.
+    Returns True if flashing is supported (Windows and pywin32 installed), False otherwise.
+    """
+    global win32gui, win32con
+    if sys.platform != 'win32':
+        return False
+    try:
+        import win32gui as _win32gui
+        import win32con as _win32con
+    except ImportError:
+        # If pywin32 is not installed, disable flashing
+        return False
+    win32gui, win32con = _win32gui, _win32con
+    return True
 
 
-class _ClientWrapper:
+def _set_clipboard_native(text):
     """
-    Minimal wrapper to provide .models.count_tokens(...) and proxy .responses
-    so the GUI can call token counting without depending on SDK features.
+    Puts text on the system clipboard without going through Tk, so it can be called from a worker thread.
+    Uses win32clipboard on Windows, pbcopy on macOS and xclip or xsel elsewhere.
+
+    Args:
+        text (str): The text to copy.
+    Returns:
+        bool: True if the text was copied, False if no native clipboard tool is available.
     """
-    def __init__(self, openai_client, encoding_getter):
-        self._inner = openai_client
-        self.models = _ModelsWrapper(encoding_getter)
-        # Proxy responses for potential future use; safe no-op for GUI
-        self.responses = getattr(openai_client, "responses", None)
+    if sys.platform == 'win32':
+        try:
+            import win32clipboard
+        except ImportError:
+            return False
+        win32clipboard.OpenClipboard()
+        try:
+            win32clipboard.EmptyClipboard()
+            win32clipboard.SetClipboardText(text, win32clipboard.CF_UNICODETEXT)
+        finally:
+            win32clipboard.CloseClipboard()
+        return True
+
+    if sys.platform == 'darwin':
+        commands = (["pbcopy"],)
+    else:
+        commands = (["xclip", "-selection", "clipboard"], ["xsel", "--clipboard", "--input"])
+    for command in commands:
+        if shutil.which(command[0]):
+            subprocess.run(command, input=text, text=True, encoding="utf-8", check=True)
+            return True
+    return False
+
+
+class _ReplyCancelled(Exception):
+    """Raised by an on_delta callback to abort a streaming reply (e.g. because the app is closing)."""
 
 
 class OpenAIChatSession:
@@ -68,40 +174,32 @@ class OpenAIChatSession:
         self.model = model
         # Initialize OpenAI API client and session state
         self._client = OpenAI(api_key=self.api_key)
-        # Provide a minimal client wrapper for token counting used by the GUI
-        self.client = _ClientWrapper(self._client, self._get_encoding_for_model)
         self.reasoning_effort = None
         self.previous_response_id = None
         self.token_count = 0
+        # (history key, mapped history messages) reused while requests must resend the full history
+        self._history_payload_cache = None
 
-    def send_message_to_OpenAI_API(self, prompt, history=None):
+    def send_message_to_OpenAI_API(self, prompt, history=None, on_delta=None):
         """
         Sends a new prompt to the OpenAI chat session and returns the response text, updates the token count
 
         Args:
             prompt (str): The user prompt.
-            history (list | None): Optional prior conversation messages as dicts with keys 'role' and 'message_text'.
+            history (tuple | None): Optional prior conversation messages as parallel (roles, texts) sequences.
+            on_delta (callable | None): Optional callback; if given, the response is streamed and
+                on_delta(text) is called with each chunk of reply text as it arrives. It may raise
+                _ReplyCancelled to abort the request.
         Returns:
             str: The AI's reply text or None if there was an error.
+        Raises:
+            _ReplyCancelled: If on_delta aborted the request.
         """
         try:
             # Build input payload. If we don't yet have a previous_response_id and we have history,
             # send the full history to maintain context. Otherwise, send only the new user prompt
             # and rely on previous_response_id for threading.
-            input_payload = [{"role": "user", "content": prompt}]
-            if not self.previous_response_id and history:
-                msgs = []
-                for m in history or []:
-                    try:
-                        role = m.get("role", "user") if isinstance(m, dict) else "user"
-                        content = m.get("message_text", "") if isinstance(m, dict) else ""
-                    except Exception:
-                        role, content = "user", ""
-                    # Map our internal 'model' role to API's 'assistant'
-                    role_api = "assistant" if role == "model" else role
-                    msgs.append({"role": role_api, "content": content})
-                msgs.append({"role": "user", "content": prompt})
-                input_payload = msgs
+            input_payload = self._build_input_payload(prompt, None if self.previous_response_id else history)
 
             # Prepare request with optional previous_response_id to preserve conversation
             kwargs = {
@@ -113,35 +211,20 @@ class OpenAIChatSession:
             if self.previous_response_id:
                 kwargs["previous_response_id"] = self.previous_response_id
 
-            if self._is_reasoning_compatible_model(self.model) and self.reasoning_effort in {"low", "medium", "high"}:
+            if self._is_reasoning_compatible_model(self.model) and self.reasoning_effort in _VALID_EFFORTS:
                 kwargs["reasoning"] = {"effort": self.reasoning_effort}
 
-            response = self._client.responses.create(**kwargs)
+            response = self._create_response(kwargs, on_delta)
+            reply_text = self._extract_text(response)
 
-            # Extract text output robustly
-            reply_text = None
-            try:
-                reply_text = response.output_text
-            except Exception:
-                # Fallback aggregation if output_text is not present
-                texts = []
-                try:
-                    for item in getattr(response, "output", []) or []:
-                        if getattr(item, "type", None) == "message":
-                            for c in getattr(item, "content", []) or []:
-                                if getattr(c, "type", None) == "output_text":
-                                    txt = getattr(c, "text", "")
-                                    if txt:
-                                        texts.append(txt)
-                except Exception:
-                    pass
-                reply_text = "\n".join(texts).strip() if texts else None
-
-            # Update conversation threading id
+            # Update conversation threading id; later turns send only the prompt, so the history payload can go
             self.previous_response_id = getattr(response, "id", None)
+            self._history_payload_cache = None
 
             # Return text (None will be handled by caller)
             return reply_text
+        except _ReplyCancelled:
+            raise
         except Exception as e:
             # Handle missing previous response by retrying without previous_response_id and using manual history
             err_text = str(e)
@@ -149,96 +232,159 @@ class OpenAIChatSession:
                 try:
                     # Reset and retry without previous_response_id
                     self.previous_response_id = None
-                    input_payload = [{"role": "user", "content": prompt}]
-                    if history:
-                        msgs = []
-                        for m in history or []:
-                            try:
-                                role = m.get("role", "user") if isinstance(m, dict) else "user"
-                                content = m.get("message_text", "") if isinstance(m, dict) else ""
-                            except Exception:
-                                role, content = "user", ""
-                            role_api = "assistant" if role == "model" else role
-                            msgs.append({"role": role_api, "content": content})
-                        msgs.append({"role": "user", "content": prompt})
-                        input_payload = msgs
+                    input_payload = self._build_input_payload(prompt, history)
 
                     kwargs_retry = {"model": self.model, "input": input_payload, "store": True}
-                    if self._is_reasoning_compatible_model(self.model) and self.reasoning_effort in {"low", "medium", "high"}:
+                    if self._is_reasoning_compatible_model(self.model) and self.reasoning_effort in _VALID_EFFORTS:
                         kwargs_retry["reasoning"] = {"effort": self.reasoning_effort}
-                    response = self._client.responses.create(**kwargs_retry)
-
-                    reply_text = None
-                    try:
-                        reply_text = response.output_text
-                    except Exception:
-                        texts = []
-                        try:
-                            for item in getattr(response, "output", []) or []:
-                                if getattr(item, "type", None) == "message":
-                                    for c in getattr(item, "content", []) or []:
-                                        if getattr(c, "type", None) == "output_text":
-                                            txt = getattr(c, "text", "")
-                                            if txt:
-                                                texts.append(txt)
-                        except Exception:
-                            pass
-                        reply_text = "\n".join(texts).strip() if texts else None
+                    response = self._create_response(kwargs_retry, on_delta)
+                    reply_text = self._extract_text(response)
 
                     self.previous_response_id = getattr(response, "id", None)
+                    self._history_payload_cache = None
                     return reply_text
+                except _ReplyCancelled:
+                    raise
                 except Exception as e2:
                     print(f"Error during OpenAI API request after retry: {e2}")
                     return None
             print(f"Error during OpenAI API request: {e}")
             return None
 
+    def _build_input_payload(self, prompt, history=None):
+        """
+        Builds the Responses API input list: the mapped history messages (if any) followed by the new user prompt.
+        The mapped history is cached until a response succeeds, so resending the same history (e.g. after a failed
+        request) doesn't rebuild it.
+
+        Args:
+            prompt (str): The user prompt.
+            history (tuple | None): Prior conversation messages as parallel (roles, texts) sequences.
+        Returns:
+            list: Input messages as dicts with keys 'role' and 'content'.
+        """
+        prompt_msg = {"role": "user", "content": prompt}
+        if not history:
+            return [prompt_msg]
+        roles, texts = history
+        key = (id(roles), len(roles))
+        if self._history_payload_cache and self._history_payload_cache[0] == key:
+            msgs = self._history_payload_cache[1]
+        else:
+            msgs = [{"role": _ROLE_MAP.get(r, "user"), "content": t} for r, t in zip(roles, texts)]
+            self._history_payload_cache = (key, msgs)
+        return [*msgs, prompt_msg]
+
+    def _create_response(self, kwargs, on_delta=None):
+        """
+        Issues a Responses API request and returns the final response object.
+        If on_delta is given the response is streamed: on_delta(text) is called for every output text delta,
+        on the thread that made the request, and the completed response is returned at the end of the stream.
+        """
+        if on_delta is None:
+            return self._client.responses.create(**kwargs)
+
+        response = None
+        for event in self._client.responses.create(stream=True, **kwargs):
+            event_type = getattr(event, "type", None)
+            if event_type == "response.output_text.delta":
+                on_delta(event.delta)
+            elif event_type in ("response.completed", "response.incomplete"):
+                response = event.response
+            elif event_type == "response.failed":
+                error = getattr(event.response, "error", None)
+                raise Exception(getattr(error, "message", None) or "The response failed.")
+            elif event_type == "error":
+                raise Exception(getattr(event, "message", "Unknown streaming error"))
+        if response is None:
+            raise Exception("Response stream ended without a final response.")
+        return response
+
+    @staticmethod
+    def _extract_text(response):
+        """
+        Returns the reply text of a Responses API response, or None if it has no text output.
+        Uses response.output_text and falls back to joining the output_text parts of the message items.
+        """
+        try:
+            return response.output_text
+        except AttributeError:
+            pass
+        try:
+            texts = [c.text for item in (response.output or []) if item.type == "message"
+                     for c in (item.content or []) if c.type == "output_text" and c.text]
+        except AttributeError:
+            return None
+        return "\n".join(texts).strip() or None
+
     @staticmethod
+    @functools.lru_cache(maxsize=8)
     def _get_encoding_for_model(model_name: str):
         """
         Return a tiktoken encoding for the given model, with sensible fallbacks.
+        Cached per model name so the BPE tables are only loaded once.
         """
+        import tiktoken  # Imported on first use to keep app startup fast
         try:
             return tiktoken.encoding_for_model(model_name)
         except Exception:
-            # Prefer o200k_base for 'o' family models if available, else fallback to cl100k_base
+            pass
+        # Prefer o200k_base for 'o' family models if available, else fallback to cl100k_base
+        if model_name and (model_name.startswith(_O200K_PREFIXES) or any(h in model_name for h in _O200K_HINTS)):
             try:
-                if model_name and ("gpt-4o" in model_name or model_name.startswith("o") or "omni" in model_name):
-                    return tiktoken.get_encoding("o200k_base")
+                return tiktoken.get_encoding("o200k_base")
             except Exception:
                 pass
-            return tiktoken.get_encoding("cl100k_base")
+        return tiktoken.get_encoding("cl100k_base")
 
     @staticmethod
+    @functools.lru_cache(maxsize=128)
     def _is_reasoning_compatible_model(model_name: str) -> bool:
         """
         Returns True if the given model supports the reasoning.effort parameter.
-        Initial rule: enable for gpt-5 family models.
+        Enabled for model families listed in _REASONING_PREFIXES (currently gpt-5).
+        """
+        return bool(model_name) and model_name.startswith(_REASONING_PREFIXES)
+
+    def count_tokens(self, text) -> int:
+        """
+        Returns the number of tokens in `text` for this session's model, using the cached tiktoken encoding.
+        Returns 0 on any failure to keep the UI robust.
         """
         try:
-            return bool(model_name) and str(model_name).startswith("gpt-5")
+            return len(self._get_encoding_for_model(self.model).encode(text or ""))
         except Exception:
-            return False
+            return 0
+
+    def add_message_tokens(self, text):
+        """
+        Adds the token count of a single new message to the running total and returns that count.
+        Only the new text is encoded, so the cost per turn does not grow with the history length.
+        """
+        count = self.count_tokens(text)
+        self.token_count += count
+        return count
 
-    def update_token_count(self, history):
+    def count_tokens_batch(self, texts):
         """
-        Recompute total tokens in the conversation context using tiktoken.
-        `history` is a list of dicts with 'message_text' keys.
+        Counts the tokens of several texts at once using tiktoken.
+        Used when a whole history has to be counted at once; new turns use add_message_tokens().
+
+        Args:
+            texts (Sequence[str]): The texts to count.
+        Returns:
+            list[int]: The token count of each text.
+        Raises:
+            Exception: If no encoding could be loaded.
         """
+        enc = self._get_encoding_for_model(self.model)
         try:
-            enc = self._get_encoding_for_model(self.model)
-            total = 0
-            for m in history or []:
-                text = ""
-                try:
-                    text = m.get("message_text", "") if isinstance(m, dict) else ""
-                except Exception:
-                    text = ""
-                total += len(enc.encode(text))
-            self.token_count = total
-        except Exception as e:
-            print(f"Error updating token count: {e}")
-            # Keep previous token_count
+            # Encode all texts in one call; tiktoken releases the GIL and spreads the work over threads
+            encoded = enc.encode_ordinary_batch(list(texts), num_threads=min(8, os.cpu_count() or 1))
+        except Exception:
+            # Fall back to encoding one text at a time
+            encoded = [enc.encode(text) for text in texts]
+        return [len(tokens) for tokens in encoded]
 
 
 class Conversation:
@@ -247,36 +393,65 @@ class Conversation:
     """
     def __init__(self, api_key, name="New Conversation", model="default model name"):
         self.name = name
-        self.chat_history = []  # Store message dictionaries: {'role': 'user/model', 'message_text': 'full message text'}
+        # Chat history stored as parallel sequences, one entry per message
+        self.roles = []  # 'user' or 'model'
+        self.texts = []  # Full message text
+        self.token_counts = array.array('i')  # Token count of each message text
         self.OpenAI_chat_session = OpenAIChatSession(api_key, model)
 
-    def send_message(self, prompt):
+    def send_message(self, prompt, on_delta=None):
         """
         Sends a message to the OpenAI chat session, updates the conversation history and returns the response.
         Uses the API key associated with this conversation.
 
         Args:
             prompt (str): The user prompt.
+            on_delta (callable | None): Optional callback receiving reply text chunks while the response streams.
         Returns:
             str: The AI's reply text, or None if there was an error.
         """
         try:
-            ai_reply_text = self.OpenAI_chat_session.send_message_to_OpenAI_API(prompt, history=self.chat_history)
+            ai_reply_text = self.OpenAI_chat_session.send_message_to_OpenAI_API(prompt,
+                                                                                history=(self.roles, self.texts),
+                                                                                on_delta=on_delta)
             if ai_reply_text:
-                self.chat_history.append({"role": "user", "message_text": prompt})
-                self.chat_history.append({"role": "model", "message_text": ai_reply_text})
-                # Update total tokens in context for display
-                try:
-                    self.OpenAI_chat_session.update_token_count(self.chat_history)
-                except Exception as _:
-                    pass
+                self.append_message("user", prompt)
+                self.append_message("model", ai_reply_text)
                 return ai_reply_text
             else:
                 return None
+        except _ReplyCancelled:
+            raise
         except Exception as e:
             print(f"Error sending message in Conversation: {e}")
             return None
 
+    def append_message(self, role, text):
+        """
+        Appends a message to the history and adds its tokens to the total tokens in context
+        (only the new message is encoded).
+
+        Args:
+            role (str): 'user' or 'model'.
+            text (str): The full message text.
+        """
+        self.roles.append(role)
+        self.texts.append(text)
+        self.token_counts.append(self.OpenAI_chat_session.add_message_tokens(text))
+
+    def recount_tokens(self):
+        """
+        Recounts the tokens of every message in the history, e.g. after the history was loaded or the model
+        changed. Rebuilds token_counts and the session's total together so they stay consistent.
+        """
+        try:
+            counts = self.OpenAI_chat_session.count_tokens_batch(self.texts)
+        except Exception as e:
+            print(f"Error updating token count: {e}")
+            return  # Keep previous counts
+        self.token_counts = array.array('i', counts)
+        self.OpenAI_chat_session.token_count = sum(counts)
+
     def get_api_key(self):
         """Returns the API key associated with this conversation."""
         return self.OpenAI_chat_session.api_key
@@ -285,26 +460,39 @@ class Conversation:
         """Returns the AI model name associated with this conversation."""
         return self.OpenAI_chat_session.model
 
+    def get_token_count(self):
+        """
+        Returns the number of tokens in this conversation's context. The total is kept up to date as messages
+        are appended (and recomputed by recount_tokens), so reading it doesn't count anything.
+        """
+        return self.OpenAI_chat_session.token_count
+
     def get_history(self):
-        """Returns the chat history for this conversation."""
-        return self.chat_history
+        """Returns the chat history for this conversation as a list of {'role', 'message_text'} dicts."""
+        return [{"role": role, "message_text": text} for role, text in zip(self.roles, self.texts)]
 
 
 def _read_api_key_from_file():
     """
     Reads the OpenAI API key from the OpenAI_API_key.txt file.
     Returns the API key if successful, None otherwise.
+    A successfully read key is cached, so the file is read only once per app run; if it is missing, empty or
+    unreadable it is tried again on the next call (the user may create it while the app is running).
     """
+    global _cached_api_key
+    if _cached_api_key:
+        return _cached_api_key
     api_key_file = "OpenAI_API_key.txt"
     try:
-        filepath = os.path.join(os.path.dirname(__file__), api_key_file) # Ensure file is in the same directory
-        with open(filepath, "r") as f:
-            key = f.readline().strip()
-            if key:
-                return key
-            else:
-                print(f"Warning: API key file '{api_key_file}' is empty.")
-                return None
+        filepath = pathlib.Path(__file__).with_name(api_key_file) # Ensure file is in the same directory
+        lines = filepath.read_text(encoding="utf-8-sig").splitlines()
+        key = lines[0].strip() if lines else ""
+        if key:
+            _cached_api_key = key
+            return key
+        else:
+            print(f"Warning: API key file '{api_key_file}' is empty.")
+            return None
     except FileNotFoundError:
         print(f"Warning: API key file '{api_key_file}' not found. User will be prompted to enter it.")
         return None
@@ -325,15 +513,15 @@ class NewConversationDialog(tk.Toplevel):
         self.initial_api_key = initial_api_key
         self.default_name = default_name
         self.result = None  # Store (api_key, model_name, conversation_name) or None if cancelled
+        self._loaded_models = []  # Model list currently applied to the model combobox
 
         self.title("New Conversation Settings")
         self.transient(parent) # Keep on top of parent
         self.grab_set()        # Make modal
         self.resizable(False, False)
 
-        # Apply background color from style
-        popup_bg = self.style.lookup('.', 'background')
-        self.config(bg=popup_bg, padx=15, pady=15)
+        # Apply background color from the dark theme palette
+        self.config(bg=_DARK_PALETTE['BG'], padx=15, pady=15)
 
         # --- Variables ---
         self.api_key_var = tk.StringVar(value=self.initial_api_key or "")
@@ -414,8 +602,8 @@ class NewConversationDialog(tk.Toplevel):
         self.status_var.set("Loading models...")
         self.update_idletasks() # Show status message
         self.load_models_button.config(state=tk.DISABLED)
-        self.model_combobox.set('') # Clear previous selection/values
-        self.model_combobox.config(values=[], state=tk.DISABLED)
+        self.model_combobox.set('') # Clear previous selection (values are kept until the new list is known)
+        self.model_combobox.config(state=tk.DISABLED)
         self.ok_button.config(state=tk.DISABLED)
 
         available_models = []
@@ -423,12 +611,16 @@ class NewConversationDialog(tk.Toplevel):
             # List available models using OpenAI API
             client = OpenAI(api_key=api_key)
             models_list = client.models.list()
-            available_models = sorted([m.id for m in getattr(models_list, "data", []) if hasattr(m, "id")])
+            available_models = sorted(m.id for m in getattr(models_list, "data", None) or ())
 
             if not available_models:
                 raise Exception("No models found.") # Raise exception if models list is empty
 
-            self.model_combobox.config(values=available_models, state="readonly")
+            # Only push the values to Tk if the list actually changed
+            if available_models != self._loaded_models:
+                self.model_combobox.config(values=available_models)
+                self._loaded_models = available_models
+            self.model_combobox.config(state="readonly")
 
             # Pre-select the first available one
             self.model_combobox.current(0)
@@ -446,6 +638,8 @@ class NewConversationDialog(tk.Toplevel):
             print(error_msg) # Log the error
             self.status_var.set("Failed to load models. Check API key and connection.")
             messagebox.showerror("Model Loading Error", error_msg, parent=self)
+            self.model_combobox.config(values=[]) # Clear stale values
+            self._loaded_models = []
             # Keep OK disabled
         finally:
             self.load_models_button.config(state=tk.NORMAL) # Re-enable button
@@ -457,7 +651,7 @@ class NewConversationDialog(tk.Toplevel):
             if OpenAIChatSession._is_reasoning_compatible_model(model_name):
                 # Compatible model - enable selector and set to medium if not already set
                 self.reasoning_combobox.config(state="readonly")
-                if self.reasoning_effort_var.get() not in ("low", "medium", "high"):
+                if self.reasoning_effort_var.get() not in _VALID_EFFORTS:
                     self.reasoning_effort_var.set("medium")
             else:
                 # Incompatible model - show unavailable and disable
@@ -498,6 +692,27 @@ class NewConversationDialog(tk.Toplevel):
         self.destroy()
 
 
+class _Msg:
+    """A message shown in the messages Treeview. Slotted to keep per-message memory low."""
+    __slots__ = ('role', 'text', 'display')
+
+    def __init__(self, role, text):
+        self.role = sys.intern(role)  # 'user' or 'model'; interned so all messages share the same string
+        self.text = text
+        self.display = _format_row(role, text)  # Treeview row text, computed once and reused on every redisplay
+
+
+def _format_row(role, message_text):
+    """Returns the messages Treeview row text for a message: capitalized role and the first 20 characters."""
+    prefix = _PREFIX.get(role) or f"{role.capitalize()}: "
+    return prefix + message_text[:_TRUNC] + (_ELLIPSIS if len(message_text) > _TRUNC else '')
+
+
+def _row_tags(role):
+    """Returns the messages Treeview tags for a message ('ai_message' gives AI replies their background)."""
+    return ("ai_message",) if role == "model" else ()
+
+
 class AIChatApp:
     def __init__(self, root):
         self.root = root
@@ -509,19 +724,51 @@ class AIChatApp:
 
         self.provider = tk.StringVar(value="OpenAI")  # Fixed to OpenAI
         self.conversations = []  # List to hold Conversation instances
+        self._conversations_by_name = {}  # Conversation name -> Conversation instance, kept in sync with conversations
         self.active_conversation = None  # Currently selected Conversation object
         self.conversation_names = tk.StringVar()  # For Combobox values
         self.conversation_name_list = []  # List of conversation names for Combobox
-        self.conversation_ids = {}  # Dictionary to store conversation name -> list of message node IDs
-        self.message_node_to_content = {}  # Dictionary to map Treeview message node IDs to full message content
+        self._conv_list_version = 0  # Incremented whenever conversations are added (or removed/renamed)
+        self._conv_list_applied_version = -1  # _conv_list_version the Combobox values were last built from
+        self._applied_selected_name = None  # Conversation name last shown in the Combobox
+        self._conversation_msgs = {}  # Conversation name -> list of _Msg for its history, reused across redisplays
+        # Windowed messages Treeview: only rows [_window_first, _window_first + _TREEVIEW_WINDOW_SIZE) of the
+        # active conversation are inserted
+        self._all_messages_for_current_conv = []  # _Msg list of the displayed conversation (source of truth)
+        self._window_first = 0  # Absolute index of the first message in the Treeview
+        self._index_to_node = {}  # Absolute message index -> Treeview node ID, for the rows in the window
+        self._node_to_index = {}  # Treeview node ID -> absolute message index
+        self._selected_index = None  # Absolute index of the selected message, kept while it's outside the window
+        self._window_slide_pending = False  # True while a _slide_visible_window idle job is scheduled
         self.conversation_counter = 1  # Counter for conversation names
         self.current_conversation_api_key_display = tk.StringVar(value="API Key: N/A")  # For API Key display label
-        self.waiting_popup = None # To hold the waiting popup window
+        self.waiting_popup = None # The waiting popup window; created on first use, then withdrawn and reused
+        self._hwnd_root = None  # Top-level window handle for taskbar flashing, resolved on the first flash
+        self._flash_flags = 0  # FlashWindowEx flags, set together with _hwnd_root
         self.model_selection_dialog = None # To hold the model selection popup window
         self.total_tokens_used_display = tk.StringVar(value="Tokens: N/A")
         self.model_name_display = tk.StringVar(value="Model: N/A")
+        # Text last set on each status label StringVar (by variable name), so unchanged values aren't set again
+        self._status_texts = {}
         self.selected_message_token_count_var = tk.StringVar(value="")
         self.prompt_token_count_var = tk.StringVar(value="Tokens: 0")
+        self._prompt_count_job = None  # Pending after() job for the debounced prompt token count
+        self._prompt_dirty = False  # True if the prompt editor changed since its tokens were last counted
+        self._prompt_count_model = None  # Model name the prompt tokens were last counted with
+        self._delta_buffer = collections.deque()  # Streamed reply chunks not yet written to the Message display
+        self._delta_flush_pending = False  # True while a _flush_delta_buffer after() job is scheduled
+        # Conversation whose reply is currently being streamed into the Message display; reset to None when
+        # the display is used for something else, which stops the stream from writing to it
+        self._streaming_conversation = None
+        # Worker threads for OpenAI API requests, so the Tk mainloop keeps running while waiting for a reply
+        self._api_executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+        # Worker thread for counting tokens of selected messages, and the id of the latest count request
+        self._token_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self._token_req_id = 0
+        self._closing = False  # Set when the main window is closed; worker threads stop handing results back
+        # LRU cache (model name, text digest) -> token count shared by prompt and message token counting
+        self._token_cache = collections.OrderedDict()
+        self._token_cache_lock = threading.Lock()  # The cache is also used from the token worker thread
         # Reasoning effort UI state for active conversation (main window control)
         self.reasoning_effort_ui_var = tk.StringVar(value="medium")
         # No active conversation at app init - show unavailable and disable
@@ -529,32 +776,50 @@ class AIChatApp:
 
         self._create_widgets()
 
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
         self.root.state('zoomed')  # Maximize window
 
+    def _on_close(self):
+        """
+        Handles closing the main window. Queued worker jobs are cancelled and a streaming reply is aborted on
+        its next chunk (see _on_reply_delta), so a pending request doesn't keep the process alive until it
+        finishes; results of jobs still running are dropped by _after_from_worker.
+        """
+        self._closing = True
+        self._api_executor.shutdown(wait=False, cancel_futures=True)
+        self._token_executor.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
+
+    def _after_from_worker(self, delay_ms, callback, *args):
+        """
+        Schedules callback(*args) on the Tk thread from a worker thread. Does nothing once the app is closing,
+        as the Tk interpreter may already be gone.
+
+        Args:
+            delay_ms (int): Delay before the callback runs, in milliseconds.
+            callback (callable): The function to call on the Tk thread.
+            *args: Arguments for the callback.
+        """
+        if self._closing:
+            return
+        try:
+            self.root.after(delay_ms, callback, *args)
+        except (RuntimeError, tk.TclError):
+            if not self._closing: # Only expected if the window was closed since the check above
+                raise
+
     def _setup_dark_theme(self):
         """Configures ttk styles for a dark theme."""
-        # Define dark theme colors
-        BG_COLOR = '#2E2E2E'
-        FG_COLOR = '#EAEAEA'
-        SELECT_BG = '#4A4A4A'  # Background for selected items/hover
-        SELECT_FG = '#FFFFFF'
-        WIDGET_BG = '#3C3C3C'  # Background for widgets like buttons, entries
-        TEXT_FG = '#FFFFFF'  # Text color for most widgets
-        DISABLED_FG = '#777777'  # Color for disabled text/widgets
-        TREEVIEW_HEADING_BG = '#3C3C3C'
-        TREEVIEW_FIELD_BG = '#383838'  # Background of the treeview item area
-        AI_MSG_BG = '#203A20'  # Dark green background for AI messages in Treeview
-
         # --- Store colors needed later for tk widgets or tags ---
-        self.bg_color = BG_COLOR
-        self.fg_color = FG_COLOR
-        self.widget_bg_color = WIDGET_BG
-        self.text_fg_color = TEXT_FG
-        self.text_bg_color = WIDGET_BG
-        self.select_bg_color = SELECT_BG
-        self.select_fg_color = SELECT_FG
-        self.text_insert_color = FG_COLOR  # Cursor color
-        self.ai_msg_bg_color = AI_MSG_BG
+        self.bg_color = _DARK_PALETTE['BG']
+        self.fg_color = _DARK_PALETTE['FG']
+        self.widget_bg_color = _DARK_PALETTE['WIDGET_BG']
+        self.text_fg_color = _DARK_PALETTE['TEXT_FG']
+        self.text_bg_color = _DARK_PALETTE['WIDGET_BG']
+        self.select_bg_color = _DARK_PALETTE['SELECT_BG']
+        self.select_fg_color = _DARK_PALETTE['SELECT_FG']
+        self.text_insert_color = _DARK_PALETTE['FG']  # Cursor color
+        self.ai_msg_bg_color = _DARK_PALETTE['AI_MSG_BG']
 
         try:
             # Attempt to use 'clam' theme which is often more customizable
@@ -562,58 +827,16 @@ class AIChatApp:
         except tk.TclError:
             print("Theme 'clam' not available, using default.")
 
-        # Global style configurations
-        self.style.configure('.',
-                             background=BG_COLOR,
-                             foreground=FG_COLOR,
-                             fieldbackground=WIDGET_BG,  # Default field bg
-                             troughcolor=BG_COLOR)  # Scrollbar trough
-
-        # Specific widget styles
-        self.style.configure('TFrame', background=BG_COLOR)
-        self.style.configure('TLabel', background=BG_COLOR, foreground=FG_COLOR)
-        self.style.configure('TButton', background=WIDGET_BG, foreground=TEXT_FG)
-        self.style.map('TButton',
-                       background=[('active', SELECT_BG), ('disabled', BG_COLOR)],
-                       foreground=[('active', SELECT_FG), ('disabled', DISABLED_FG)])
-
-        self.style.configure('TCombobox',
-                             fieldbackground=WIDGET_BG,
-                             background=WIDGET_BG,
-                             foreground=TEXT_FG,
-                             arrowcolor=FG_COLOR,
-                             selectbackground=SELECT_BG,  # Selection color in dropdown
-                             selectforeground=SELECT_FG)
-        # Map ensures hover/focus looks right if theme supports it
-        self.style.map('TCombobox', fieldbackground=[('readonly', WIDGET_BG)],
-                       selectbackground=[('readonly', SELECT_BG)],
-                       selectforeground=[('readonly', SELECT_FG)])
-
-        self.style.configure('Treeview',
-                             background=TREEVIEW_FIELD_BG,
-                             foreground=FG_COLOR,
-                             fieldbackground=TREEVIEW_FIELD_BG,  # Item area background
-                             rowheight=25)  # Adjust if needed
-        self.style.configure('Treeview.Heading',
-                             background=TREEVIEW_HEADING_BG,
-                             foreground=FG_COLOR,
-                             relief='flat')
-        self.style.map('Treeview.Heading',
-                       background=[('active', SELECT_BG)])  # Hover/click on heading
-
-        # Configure Treeview selection style
-        self.style.map('Treeview',
-                       background=[('selected', SELECT_BG)],
-                       foreground=[('selected', SELECT_FG)])
-
-        # Configure PanedWindow sash (the divider)
-        self.style.configure('TPanedwindow', background=BG_COLOR)
-        self.style.configure('Sash', background=WIDGET_BG, sashthickness=6, relief='raised')
+        # Apply the style tables in a single pass
+        for style_name, options in _STYLE_TABLE.items():
+            self.style.configure(style_name, **options)
+        for style_name, state_maps in _STYLE_MAP_TABLE.items():
+            self.style.map(style_name, **state_maps)
 
     def _create_widgets(self):
         """Creates and lays out all the main widgets by calling helper methods."""
         # --- Apply root background color ---
-        self.root.config(bg=self.style.lookup('.', 'background'))
+        self.root.config(bg=_DARK_PALETTE['BG'])
 
         # --- Conversation Selection Frame (Top of Window) ---
         self._create_conversation_controls(self.root)
@@ -682,9 +905,11 @@ class AIChatApp:
         tree_frame.pack(fill=tk.BOTH, expand=True)
 
         self.messages_scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL)
+        # The Treeview only holds a window of the conversation, so both directions of the scrollbar link go
+        # through handlers that translate between window and whole-conversation positions
         self.messages_tree = ttk.Treeview(tree_frame, show="tree",
-                                          yscrollcommand=self.messages_scrollbar.set) # Link treeview to scrollbar
-        self.messages_scrollbar.config(command=self.messages_tree.yview) # Link scrollbar to treeview
+                                          yscrollcommand=self._on_messages_tree_yscroll) # Link treeview to scrollbar
+        self.messages_scrollbar.config(command=self._on_messages_scrollbar) # Link scrollbar to treeview
 
         # Pack scrollbar first, then treeview
         self.messages_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
@@ -765,34 +990,148 @@ class AIChatApp:
         # Pack scrollbar first, then text editor
         self.prompt_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.prompt_text_editor.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        # Recount prompt tokens while typing (debounced, see _update_prompt_token_count)
+        self.prompt_text_editor.bind("<KeyRelease>", lambda event: self._update_prompt_token_count())
+        # Track edits so the prompt isn't recounted when nothing changed
+        self.prompt_text_editor.bind("<<Modified>>", self._on_prompt_modified)
 
         # Button to send the prompt (below the editor frame)
         self.send_button = ttk.Button(prompt_frame, text="Send", command=self.send_prompt)
         self.send_button.pack(pady=5)
 
-    def _insert_message_to_treeview(self, role, message_content):
+    def _insert_message_to_treeview(self, message):
         """
         Inserts a message into the messages_tree with role, truncated text, and appropriate tags.
+        The caller records the node ID in the index maps.
 
         Args:
-            role (str): 'user' or 'model', indicating the sender.
-            message_content (str): The full message text.
+            message (_Msg): The message to insert.
 
         Returns:
             str: The node ID of the inserted message in the Treeview.
         """
+        node_id = self.messages_tree.insert("", tk.END, text=message.display, tags=_row_tags(message.role))
+        return node_id
 
-        tags = ()  # Default tag is empty tuple
-        if role == 'model': # If it's AI message
-            tags = "ai_message" # Add 'ai_message' tag for background
+    def _refresh_visible_window(self, first_index, top_index=None):
+        """
+        Fills the messages Treeview with the window of _TREEVIEW_WINDOW_SIZE messages starting at first_index
+        (clamped so the window stays inside the conversation), replacing the current rows.
 
-        # Conditional truncation logic
-        display_text = message_content
-        if len(message_content) > 20:
-            display_text = message_content[:20] + "..."
+        Args:
+            first_index (int): Absolute index of the first message to insert.
+            top_index (int, optional): Absolute index of the message to scroll to the top of the view.
+                Defaults to the message currently at the top, so sliding the window doesn't move the view.
+        """
+        msgs = self._all_messages_for_current_conv
+        if top_index is None:
+            top_index = self._window_first
+            if self._index_to_node:
+                top_index += round(self.messages_tree.yview()[0] * len(self._index_to_node))
+        first_index = max(0, min(first_index, len(msgs) - _TREEVIEW_WINDOW_SIZE))
+        # Deleting the focus item clears the Treeview focus, which stops arrow key navigation; remember it
+        focus_index = self._node_to_index.get(self.messages_tree.focus())
+
+        self.messages_tree.delete(*self.messages_tree.get_children(""))
+        self._window_first = first_index
+
+        # Same as _insert_message_to_treeview for each row, inlined with the lookups hoisted out of the loop
+        insert = self.messages_tree.insert
+        end = tk.END
+        ai_tags = _row_tags("model")
+        index_to_node = self._index_to_node = {}
+        node_to_index = self._node_to_index = {}
+        for index, message in enumerate(msgs[first_index:first_index + _TREEVIEW_WINDOW_SIZE], first_index):
+            node_id = insert("", end, text=message.display, tags=ai_tags if message.role == "model" else ())
+            index_to_node[index] = node_id
+            node_to_index[node_id] = index
+
+        row_count = len(index_to_node)
+        if row_count:
+            top_index = max(first_index, min(top_index, first_index + row_count - 1))
+            self.messages_tree.yview_moveto((top_index - first_index) / row_count)
+        # Keep the selected message highlighted if it is still in the window
+        if self._selected_index in self._index_to_node:
+            self.messages_tree.selection_set(self._index_to_node[self._selected_index])
+        # Restore the focus item: the previous one if still in the window, else the selected or top row
+        if focus_index is not None and row_count:
+            if focus_index not in index_to_node:
+                focus_index = self._selected_index if self._selected_index in index_to_node else top_index
+            self.messages_tree.focus(index_to_node[focus_index])
+
+    def _on_messages_tree_yscroll(self, first, last):
+        """
+        yscrollcommand of the messages Treeview. Maps the visible part of the window to the whole conversation
+        for the scrollbar, and slides the window when its view reaches an edge that isn't the conversation's.
 
-        node_id = self.messages_tree.insert("", tk.END, text=f"{role.capitalize()}: {display_text}", tags=tags)
-        return node_id
+        Args:
+            first (str): Fraction of the window above the view.
+            last (str): Fraction of the window at the bottom of the view.
+        """
+        first, last = float(first), float(last)
+        total = len(self._all_messages_for_current_conv)
+        count = len(self._index_to_node)
+        if not total or not count:
+            self.messages_scrollbar.set(0.0, 1.0)
+            return
+        window_first = self._window_first
+        self.messages_scrollbar.set((window_first + first * count) / total, (window_first + last * count) / total)
+
+        at_window_edge = (first <= 0.0 and window_first > 0) or (last >= 1.0 and window_first + count < total)
+        if at_window_edge and not self._window_slide_pending:
+            self._window_slide_pending = True
+            self.root.after_idle(self._slide_visible_window)
+
+    def _slide_visible_window(self):
+        """Recenters the Treeview window on the message at the top of the view."""
+        self._window_slide_pending = False
+        if not self._index_to_node:
+            return
+        top_index = self._window_first + round(self.messages_tree.yview()[0] * len(self._index_to_node))
+        first_index = max(0, min(top_index - _TREEVIEW_WINDOW_SIZE // 2,
+                                 len(self._all_messages_for_current_conv) - _TREEVIEW_WINDOW_SIZE))
+        if first_index != self._window_first: # Otherwise the window is already as close as it can get
+            self._refresh_visible_window(first_index, top_index)
+
+    def _on_messages_scrollbar(self, *args):
+        """
+        Command of the messages scrollbar. 'moveto' fractions are positions in the whole conversation; if the
+        target isn't inside the window, the window is moved there first. Unit and page scrolls go to the
+        Treeview and slide the window through _on_messages_tree_yscroll.
+
+        Args:
+            *args: The scrollbar command arguments ('moveto', fraction) or ('scroll', number, what).
+        """
+        total = len(self._all_messages_for_current_conv)
+        count = len(self._index_to_node)
+        if not total or not count:
+            return
+        if args[0] != "moveto":
+            self.messages_tree.yview(*args)
+            return
+
+        first, last = self.messages_tree.yview()
+        visible_rows = (last - first) * count
+        target_index = max(0, min(int(float(args[1]) * total), total - 1))
+        if self._window_first <= target_index and target_index + visible_rows <= self._window_first + count:
+            self.messages_tree.yview_moveto((target_index - self._window_first) / count)
+        else:
+            self._refresh_visible_window(target_index - _TREEVIEW_WINDOW_SIZE // 2, target_index)
+
+    def _sync_conversation_msgs(self, conversation):
+        """
+        Brings the cached _Msg list of a conversation up to date with its history.
+
+        Args:
+            conversation (Conversation): The conversation to sync.
+        Returns:
+            list: The _Msg objects created for messages that weren't cached yet.
+        """
+        msgs = self._conversation_msgs.setdefault(conversation.name, [])
+        start = len(msgs)
+        new_msgs = [_Msg(role, text) for role, text in zip(conversation.roles[start:], conversation.texts[start:])]
+        msgs.extend(new_msgs)
+        return new_msgs
 
     def send_prompt(self):
         prompt_text = self.prompt_text_editor.get("1.0", tk.END).strip()
@@ -804,78 +1143,158 @@ class AIChatApp:
             messagebox.showerror("Conversation Required", "Please select an active conversation.")
             return
 
+        conversation = self.active_conversation
+        self._streaming_conversation = conversation
+        self.send_button.config(state=tk.DISABLED) # One request at a time; re-enabled in _on_ai_reply
         self._show_waiting_popup() # Show the waiting popup
+        self._begin_reply_stream() # Prepare the Message display to show the reply as it streams in
 
-        ai_reply_text = self.active_conversation.send_message(prompt_text)  # Use conversation's API key
-
-        if self.waiting_popup: # Check if popup exists before destroying (should not happen)
-            self.waiting_popup.destroy() # Close the waiting popup after response is received
-            self.waiting_popup = None # Reset to None
-
-        if ai_reply_text:
-            # Add user prompt and AI reply to Treeview
-            current_conversation_name = self.conversation_combobox.get()  # Get conversation name from combobox
-            if not current_conversation_name:  # Should not happen as combobox is readonly, but for safety
-                print("Error: No active conversation name found in combobox.")
-                self.total_tokens_used_display.set("Tokens: Error") # Update status on error
-                return
-
-            # Use _insert_message_to_treeview to add messages and get node IDs
-            user_message_node_id = self._insert_message_to_treeview("user", prompt_text) # Insert user message
-            ai_message_node_id = self._insert_message_to_treeview("model", ai_reply_text) # Insert AI reply
+        # Run the request on a worker thread (uses conversation's API key); reply text is streamed into
+        # the Message display and the result is handed back to the Tk thread via root.after
+        future = self._api_executor.submit(conversation.send_message, prompt_text, self._on_reply_delta)
+        future.add_done_callback(lambda f: self._after_from_worker(0, self._on_ai_reply, f, prompt_text, conversation))
 
-            if current_conversation_name not in self.conversation_ids:
-                self.conversation_ids[current_conversation_name] = [] # Initialize list if conversation name is new (though it should exist)
-
-            self.conversation_ids[current_conversation_name].append(user_message_node_id)  # Store message node ID
-            self.conversation_ids[current_conversation_name].append(ai_message_node_id)  # Store message node ID
+    def _on_ai_reply(self, future, prompt_text, conversation):
+        """
+        Handles the finished OpenAI request started by send_prompt. Runs on the Tk thread.
+        The user may have switched conversations while waiting; the Treeview and status labels are only
+        updated if the request's conversation is still the active one (otherwise they are rebuilt from its
+        history when it is selected again).
 
-            # Store full message content associated with Treeview node IDs
-            self.message_node_to_content[user_message_node_id] = {"role": "user", "message_text": prompt_text}
-            self.message_node_to_content[ai_message_node_id] = {"role": "model", "message_text": ai_reply_text}
+        Args:
+            future (concurrent.futures.Future): The future of the Conversation.send_message call.
+            prompt_text (str): The prompt that was sent.
+            conversation (Conversation): The conversation the prompt was sent to.
+        """
+        self._flush_delta_buffer() # Write out whatever is left of the streamed reply
+        self._streaming_conversation = None
+        try:
+            ai_reply_text = future.result()
+        except Exception as e:
+            print(f"Error sending message: {e}")
+            ai_reply_text = None
 
-            self.prompt_text_editor.delete("1.0", tk.END) # clear prompt text editor after sending
-            self.prompt_token_count_var.set("Tokens: 0")  # Reset prompt token counter after sending
+        if self.waiting_popup: # Check if popup exists before hiding (should not happen)
+            self.waiting_popup.withdraw() # Hide the waiting popup after response is received
+        self.send_button.config(state=tk.NORMAL)
+        is_active = conversation is self.active_conversation
 
-            self._update_token_count_display()
+        if ai_reply_text:
+            # The conversation already counted both messages; keep the counts for selection
+            model_name = conversation.get_model_name()
+            prompt_tokens, reply_tokens = conversation.token_counts[-2:]
+            self._store_token_count(model_name, prompt_text, prompt_tokens)
+            self._store_token_count(model_name, ai_reply_text, reply_tokens)
+
+            # Clear prompt text editor after sending, unless it was edited in the meantime
+            if self.prompt_text_editor.get("1.0", tk.END).strip() == prompt_text:
+                self.prompt_text_editor.delete("1.0", tk.END)
+                self.prompt_token_count_var.set("Tokens: 0")  # Reset prompt token counter after sending
+
+            if is_active:
+                # Add the messages not yet shown (the user prompt and AI reply, unless the conversation
+                # was redisplayed in the meantime). They're only inserted if the window reaches the end of the
+                # conversation; otherwise they come into the window when the list is scrolled down.
+                msgs = self._all_messages_for_current_conv
+                window_end = self._window_first + len(self._index_to_node)
+                window_at_end = window_end == len(msgs)
+                new_msgs = self._sync_conversation_msgs(conversation)
+                if window_at_end and len(self._index_to_node) + len(new_msgs) <= _TREEVIEW_WINDOW_SIZE:
+                    new_node_ids = [self._insert_message_to_treeview(message) for message in new_msgs]
+                    new_indices = range(window_end, window_end + len(new_node_ids))
+                    # Record the new nodes with one update per map
+                    self._index_to_node.update(zip(new_indices, new_node_ids))
+                    self._node_to_index.update(zip(new_node_ids, new_indices))
+                elif window_at_end:
+                    self._refresh_visible_window(len(msgs) - _TREEVIEW_WINDOW_SIZE)
+                else:
+                    self._on_messages_tree_yscroll(*self.messages_tree.yview()) # Rescale the scrollbar
+
+                self._update_token_count_display()
 
         else:
-            messagebox.showerror("OpenAI Error", "Failed to get response from OpenAI.\n"
+            messagebox.showerror("OpenAI Error", f"Failed to get response from OpenAI in '{conversation.name}'.\n"
                                                  "Please check API key and network connection "
                                                  "(see console for details).")
-            self.total_tokens_used_display.set("Tokens: Error") # Update token count display on error
-            if self.waiting_popup: # Ensure popup is closed even in error case
-                self.waiting_popup.destroy()
-                self.waiting_popup = None
+            if is_active:
+                self._set_status(self.total_tokens_used_display, "Tokens: Error") # Update token count display on error
 
         self._flash_window()
 
+    def _begin_reply_stream(self):
+        """
+        Clears the Message display so a streamed reply can be shown there. The selected message is
+        deselected, as it is no longer displayed (selecting it again shows it instead of the reply).
+        """
+        self._delta_buffer.clear()
+        self._selected_index = None
+        self.messages_tree.selection_remove(self.messages_tree.selection())
+        self._clear_message_display()
+
+    def _on_reply_delta(self, delta):
+        """
+        Buffers a chunk of streamed reply text. Called on the API worker thread; the buffer is written
+        to the Message display by a single after() job at most every 50 ms so fast streams don't cause
+        a redraw per token.
+
+        Args:
+            delta (str): The new chunk of reply text.
+        Raises:
+            _ReplyCancelled: If the app is closing, to abort the request.
+        """
+        if self._closing:
+            raise _ReplyCancelled("The app was closed while the reply was streaming.")
+        if self._streaming_conversation is not self.active_conversation:
+            return # The Message display shows something else now (another message or conversation)
+        self._delta_buffer.append(delta)
+        if not self._delta_flush_pending:
+            self._delta_flush_pending = True
+            self._after_from_worker(50, self._flush_delta_buffer)
+
+    def _flush_delta_buffer(self):
+        """Writes all buffered reply chunks to the Message display with a single insert."""
+        self._delta_flush_pending = False
+        if self._streaming_conversation is None:
+            # The display was taken over; drop chunks the worker thread appended after the stream was stopped
+            self._delta_buffer.clear()
+            return
+        if not self._delta_buffer:
+            return
+        chunks = []
+        while self._delta_buffer:
+            chunks.append(self._delta_buffer.popleft())
+        self.message_text.config(state=tk.NORMAL)
+        self.message_text.insert(tk.END, "".join(chunks))
+        self.message_text.see(tk.END)
+        self.message_text.config(state=tk.DISABLED)
+
+    def _stop_reply_stream(self):
+        """
+        Stops writing the streamed reply to the Message display, because the display is about to show
+        something else. The reply is still added to its conversation when it completes.
+        """
+        self._streaming_conversation = None
+        self._delta_buffer.clear()
+
     def _flash_window(self):
         """Flashes the window in the taskbar on Windows if supported and not foreground."""
-        if not _FLASH_WINDOW_SUPPORTED:
+        if not _try_import_win32():
             return
 
         try:
-            # Get the top-level window handle
-            hwnd_main_frame = int(self.root.winfo_id())
-            hwnd = win32gui.GetAncestor(hwnd_main_frame, win32con.GA_ROOT)
-            if hwnd == 0:
-                hwnd = hwnd_main_frame
+            if self._hwnd_root is None:
+                # The top-level window handle doesn't change after startup; resolve it once
+                hwnd_main_frame = int(self.root.winfo_id())
+                self._hwnd_root = win32gui.GetAncestor(hwnd_main_frame, win32con.GA_ROOT) or hwnd_main_frame
+                # Flags: Flash taskbar and window caption, continuously until focus
+                self._flash_flags = win32con.FLASHW_ALL | win32con.FLASHW_TIMERNOFG
 
             # Check if window is already in foreground
-            foreground_hwnd = win32gui.GetForegroundWindow()
-            if hwnd == foreground_hwnd:
+            if win32gui.GetForegroundWindow() == self._hwnd_root:
                 return  # Don't flash if already active
 
-            # Flags: Flash taskbar and window caption, continuously until focus
-            flags = win32con.FLASHW_ALL | win32con.FLASHW_TIMERNOFG
-            # Count: Set to 0 when using FLASHW_TIMERNOFG
-            count = 0
-            # Timeout: 0 uses default cursor blink rate
-            timeout = 0
-
-            # Call FlashWindowEx
-            win32gui.FlashWindowEx(hwnd, flags, count, timeout)
+            # Count: 0 when using FLASHW_TIMERNOFG; timeout: 0 uses default cursor blink rate
+            win32gui.FlashWindowEx(self._hwnd_root, self._flash_flags, 0, 0)
 
         except Exception as e:
             print(f"Warning: Could not flash window taskbar icon: {e}")
@@ -887,6 +1306,7 @@ class AIChatApp:
         Args:
             message (str): The message text.
         """
+        self._stop_reply_stream()  # Don't append the rest of a streaming reply to this message
         self.message_text.config(state=tk.NORMAL)  # Enable editing to insert
         self.message_text.delete("1.0", tk.END)  # Clear previous message
         self.message_text.insert("1.0", message)  # Insert new message
@@ -900,29 +1320,40 @@ class AIChatApp:
 
         selected_item = self.messages_tree.selection()
         if not selected_item:
-            self._clear_message_display()  # Clears text
+            if self._selected_index in self._index_to_node or self._selected_index is None:
+                self._selected_index = None
+                if self._streaming_conversation is None: # Keep a reply streaming into the display
+                    self._clear_message_display()  # Clears text
+            # else: the selected message was only scrolled out of the window; keep showing it
             return  # Nothing selected
 
         selected_node_id = selected_item[0]
+        selected_index = self._node_to_index.get(selected_node_id)
+        if selected_index is not None and selected_index == self._selected_index:
+            return  # Same message re-selected after the window slid; it is already displayed
 
         # Find and display the message content.
-        if selected_node_id in self.message_node_to_content:
-            message_content = self.message_node_to_content[selected_node_id]['message_text'] # Get full message from dict
+        if selected_index is not None:
+            self._selected_index = selected_index
+            message_content = self._all_messages_for_current_conv[selected_index].text # Get full message
             self._display_message(message_content) # Display the full message
 
-            # Token counting
-            if self.active_conversation and self.active_conversation.OpenAI_chat_session.client:
-                try:
-                    client = self.active_conversation.OpenAI_chat_session.client
-                    model_name = self.active_conversation.get_model_name()
-                    token_count = client.models.count_tokens(model=model_name, contents=message_content).total_tokens
-                    token_info_text = f"Tokens: {token_count}"  # Set text for the token count label
-
-                except Exception as e:
-                    print(f"Error counting tokens for selected message: {e}")
-                    token_info_text = "Tokens: Error"  # Set error text for the token count label
+            # Token counting: cached counts are shown right away, others are counted on a worker thread
+            # and filled in by _apply_token_count
+            if self.active_conversation:
+                self._token_req_id += 1
+                request_id = self._token_req_id
+                token_count = self._get_cached_token_count(self.active_conversation.get_model_name(), message_content)
+                if token_count is not None:
+                    token_info_text = f"Tokens: {token_count}"
+                else:
+                    future = self._token_executor.submit(self._count_tokens_cached, self.active_conversation,
+                                                         message_content)
+                    future.add_done_callback(
+                        lambda f: self._after_from_worker(0, self._apply_token_count, f, request_id, selected_index))
+                    token_info_text = "Tokens: …"  # Placeholder until the count arrives
             else:
-                token_info_text = "Tokens: N/A"  # Indicate if client/conversation unavailable
+                token_info_text = "Tokens: N/A"  # Indicate if conversation unavailable
 
         else:
             # Fallback in case message content is not found
@@ -932,6 +1363,65 @@ class AIChatApp:
         # Update the token count label text
         self.selected_message_token_count_var.set(token_info_text)
 
+    @staticmethod
+    def _token_cache_key(model_name, text):
+        """Returns the token cache key for `text` counted with `model_name`'s encoding."""
+        return model_name, hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+    def _get_cached_token_count(self, model_name, text):
+        """Returns the cached token count of `text` for `model_name`, or None if it isn't cached."""
+        key = self._token_cache_key(model_name, text)
+        with self._token_cache_lock:
+            token_count = self._token_cache.get(key)
+            if token_count is not None:
+                self._token_cache.move_to_end(key)
+            return token_count
+
+    def _store_token_count(self, model_name, text, token_count):
+        """Stores a token count in the LRU token cache, evicting the least recently used entry when full."""
+        key = self._token_cache_key(model_name, text)
+        with self._token_cache_lock:
+            self._token_cache[key] = token_count
+            self._token_cache.move_to_end(key)
+            if len(self._token_cache) > _TOKEN_CACHE_MAX:
+                self._token_cache.popitem(last=False)
+
+    def _count_tokens_cached(self, conversation, text):
+        """
+        Returns the token count of `text` for the conversation's model, using the token cache.
+
+        Args:
+            conversation (Conversation): The conversation whose model's encoding is used.
+            text (str): The text to count.
+        Returns:
+            int: The number of tokens.
+        """
+        model_name = conversation.get_model_name()
+        token_count = self._get_cached_token_count(model_name, text)
+        if token_count is None:
+            token_count = conversation.OpenAI_chat_session.count_tokens(text)
+            self._store_token_count(model_name, text, token_count)
+        return token_count
+
+    def _apply_token_count(self, future, request_id, message_index):
+        """
+        Shows the token count computed for a selected message. Runs on the Tk thread.
+        Results of stale requests (a newer selection was made, or the message is no longer selected) are discarded.
+
+        Args:
+            future (concurrent.futures.Future): The future of the count_tokens call.
+            request_id (int): The _token_req_id value the request was made with.
+            message_index (int): The absolute index of the message that was counted.
+        """
+        if request_id != self._token_req_id or message_index != self._selected_index:
+            return
+        try:
+            token_info_text = f"Tokens: {future.result()}"  # Set text for the token count label
+        except Exception as e:
+            print(f"Error counting tokens for selected message: {e}")
+            token_info_text = "Tokens: Error"  # Set error text for the token count label
+        self.selected_message_token_count_var.set(token_info_text)
+
     def _on_active_conversation_change(self):
         """
         Should be called when active conversation changes (new conversation added or different conversation selected)
@@ -948,13 +1438,15 @@ class AIChatApp:
         # Update model name display
         model_name = self.active_conversation.get_model_name()
         model_str = f"Model: {model_name}"
-        self.model_name_display.set(model_str)
+        self._set_status(self.model_name_display, model_str)
 
         # Reasoning selector state/value for this conversation
         self._update_reasoning_controls()
 
-        # Recalculate the token count of the current prompt editor text
-        self._update_prompt_token_count()
+        # Recalculate the token count of the current prompt editor text, unless neither the text
+        # nor the model it was counted with changed
+        if self._prompt_dirty or model_name != self._prompt_count_model:
+            self._update_prompt_token_count()
 
     def _update_reasoning_controls(self):
         """Enable/disable and set the reasoning selector for the active conversation if present."""
@@ -974,7 +1466,7 @@ class AIChatApp:
             if OpenAIChatSession._is_reasoning_compatible_model(model_name):
                 self.reasoning_effort_combobox.config(state="readonly")
                 current_effort = getattr(conv.OpenAI_chat_session, "reasoning_effort", None) or "medium"
-                if current_effort not in ("low", "medium", "high"):
+                if current_effort not in _VALID_EFFORTS:
                     current_effort = "medium"
                 self.reasoning_effort_ui_var.set(current_effort)
             else:
@@ -995,7 +1487,7 @@ class AIChatApp:
             model_name = conv.get_model_name()
             if OpenAIChatSession._is_reasoning_compatible_model(model_name):
                 effort = self.reasoning_effort_ui_var.get()
-                if effort in ("low", "medium", "high"):
+                if effort in _VALID_EFFORTS:
                     conv.OpenAI_chat_session.reasoning_effort = effort
         except Exception as e:
             print(f"Warning applying reasoning effort: {e}")
@@ -1006,25 +1498,37 @@ class AIChatApp:
         Sets the active_conversation to the selected Conversation object calls the method to update relevant GUI info.
         """
         selected_conversation_name = self.conversation_combobox.get()
-        for conv in self.conversations:
-            if conv.name == selected_conversation_name:
-                self.active_conversation = conv
-                self._on_active_conversation_change()
-                break # Exit loop once found and processed
+        self._applied_selected_name = selected_conversation_name # The Combobox already shows it
+        conv = self._conversations_by_name.get(selected_conversation_name)
+        if conv:
+            self.active_conversation = conv
+            self._on_active_conversation_change()
+
+    def _rebuild_conversation_index(self):
+        """Rebuilds the name -> Conversation lookup dict from self.conversations."""
+        self._conversations_by_name = {c.name: c for c in self.conversations}
 
     def _update_conversation_combobox(self):
         """
         Refreshes the conversation dropdown values from self.conversations and
         attempts to keep the selection on the active conversation.
+        The values and selection are only pushed to the Combobox if they changed since the last call.
         """
         try:
-            # Rebuild values list
-            self.conversation_name_list = [c.name for c in self.conversations]
-            # Apply to combobox
-            self.conversation_combobox.config(values=self.conversation_name_list)
+            # Resync the name lookup if self.conversations was changed without updating it
+            if len(self._conversations_by_name) != len(self.conversations):
+                self._rebuild_conversation_index()
+                self._conv_list_version += 1
+            if self._conv_list_version != self._conv_list_applied_version:
+                # Rebuild values list
+                self.conversation_name_list = [c.name for c in self.conversations]
+                # Apply to combobox
+                self.conversation_combobox.config(values=self.conversation_name_list)
+                self._conv_list_applied_version = self._conv_list_version
             # Keep selection aligned to active conversation if present
-            if self.active_conversation:
+            if self.active_conversation and self.active_conversation.name != self._applied_selected_name:
                 self.conversation_combobox.set(self.active_conversation.name)
+                self._applied_selected_name = self.active_conversation.name
         except Exception as e:
             print(f"Warning updating conversation combobox: {e}")
 
@@ -1054,8 +1558,7 @@ class AIChatApp:
             effort = None
 
         # Check for duplicate conversation name
-        existing_names = [conv.name for conv in self.conversations]
-        if conversation_name in existing_names:
+        if conversation_name in self._conversations_by_name:
             messagebox.showerror("Duplicate Name",
                                  f"A conversation named '{conversation_name}' already exists.\n\n"
                                  "Please try creating a new conversation with a unique name.",
@@ -1075,17 +1578,20 @@ class AIChatApp:
 
         # Apply reasoning effort to session if provided and compatible
         try:
-            if effort in ("low", "medium", "high") and OpenAIChatSession._is_reasoning_compatible_model(model_name):
+            if effort in _VALID_EFFORTS and OpenAIChatSession._is_reasoning_compatible_model(model_name):
                 new_conversation.OpenAI_chat_session.reasoning_effort = effort
         except Exception:
             pass
 
         # Add to list and update UI
         self.conversations.append(new_conversation)
+        self._conversations_by_name[new_conversation.name] = new_conversation
+        self._conv_list_version += 1 # The Combobox values need to be rebuilt
         self.conversation_counter += 1 # Increment counter for next default name suggestion
 
         self._update_conversation_combobox() # Update Combobox with new conversation names
         self.conversation_combobox.set(new_conversation.name) # Set Combobox to the new conversation
+        self._applied_selected_name = new_conversation.name
 
         # Set the new conversation as active and update GUI info
         self.active_conversation = new_conversation
@@ -1094,24 +1600,25 @@ class AIChatApp:
     def _display_conversation_in_treeview(self, conversation):
         """
         Displays a conversation's messages in the Treeview, clearing previous content and Message display.
+        Only the first window of messages is inserted; the rest are inserted as the list is scrolled.
         """
-        self.messages_tree.delete(*self.messages_tree.get_children()) # Clear Treeview
-        self.message_node_to_content = {} # Clear message content dictionary when redrawing conversation
+        self._selected_index = None
+        self._stop_reply_stream() # A reply streaming into the display isn't shown again after switching
         self._clear_message_display() # Clear Message display area when switching conversations
 
-        conversation_name = conversation.name # Get conversation name to use as key for conversation_ids
-        self.conversation_ids[conversation_name] = [] # Ensure conversation_ids has an entry for this conversation
-
-        history = conversation.get_history()
-        for message in history:
-            role = message['role']
-            message_text = message['message_text']
+        # Row texts are cached on the conversation's _Msg objects; only messages added since the last display
+        # are created here
+        self._sync_conversation_msgs(conversation)
+        self._all_messages_for_current_conv = self._conversation_msgs[conversation.name]
+        self._index_to_node = {} # Nothing of the previous conversation to keep in view
+        self._window_first = 0
 
-            # Use _insert_message_to_treeview to add messages and get node IDs
-            message_node_id = self._insert_message_to_treeview(role, message_text)
-
-            self.conversation_ids[conversation_name].append(message_node_id) # Store message node ID under conversation name
-            self.message_node_to_content[message_node_id] = message # Store full message content
+        # Unmap the Treeview during the bulk insert so Tk does a single layout pass when it is packed again
+        self.messages_tree.pack_forget()
+        try:
+            self._refresh_visible_window(0)
+        finally:
+            self.messages_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
     def _clear_message_display(self):
         """Clears the Message display area."""
@@ -1123,36 +1630,52 @@ class AIChatApp:
     def _update_api_key_display(self, conversation):
         """Updates the API key display label below the Combobox."""
         if conversation and conversation.get_api_key():
-            self.current_conversation_api_key_display.set(f"API Key: {conversation.get_api_key()}")
+            self._set_status(self.current_conversation_api_key_display, f"API Key: {conversation.get_api_key()}")
         else:
-            self.current_conversation_api_key_display.set("API Key: N/A")
+            self._set_status(self.current_conversation_api_key_display, "API Key: N/A")
 
     def _update_token_count_display(self):
         # Updates the token count display with the token count of the active conversation
-        tokens_used = self.active_conversation.OpenAI_chat_session.token_count
+        tokens_used = self.active_conversation.get_token_count()
         token_str = f"Tokens in context: {tokens_used}"
-        self.total_tokens_used_display.set(token_str)
+        self._set_status(self.total_tokens_used_display, token_str)
+
+    def _set_status(self, variable, text):
+        """
+        Sets a status label StringVar, unless it already holds the text. Each set() is a Tcl call that fires
+        the variable's traces and reconfigures its label, which switching between conversations with the same
+        model or API key would otherwise do for nothing.
+
+        Args:
+            variable (tk.StringVar): The status label variable.
+            text (str): The text to show.
+        """
+        name = str(variable)
+        if self._status_texts.get(name) != text:
+            self._status_texts[name] = text
+            variable.set(text)
 
     def _show_waiting_popup(self):
         """
-        Creates and displays the "Waiting for response.." popup window centered
-        on the main application window.
+        Displays the "Waiting for response.." popup window centered on the main application window.
+        The popup is created the first time and hidden with withdraw() when the reply arrives, then reused.
         """
-        self.waiting_popup = tk.Toplevel(self.root)
-        self.waiting_popup.title("Please Wait")
-        self.waiting_popup.transient(self.root) # Keep popup on top of main window
-        self.waiting_popup.grab_set() # Make popup modal
+        if self.waiting_popup is None:
+            self.waiting_popup = tk.Toplevel(self.root)
+            self.waiting_popup.withdraw() # Stay hidden until positioned
+            self.waiting_popup.title("Please Wait")
+            self.waiting_popup.transient(self.root) # Keep popup on top of main window
+            # Not modal: the request runs in the background, so other conversations stay usable
+            # Closing the popup only hides it, so it can be shown again for the next prompt
+            self.waiting_popup.protocol("WM_DELETE_WINDOW", self.waiting_popup.withdraw)
 
-        # Use colors from the style/theme
-        popup_bg = self.style.lookup('.', 'background')
-        # Configure Toplevel background
-        self.waiting_popup.config(bg=popup_bg, borderwidth=1, relief="solid")
+            # Configure Toplevel background from the dark theme palette
+            self.waiting_popup.config(bg=_DARK_PALETTE['BG'], borderwidth=2, relief="solid")
 
-        wait_label = ttk.Label(self.waiting_popup, text="Waiting for response..", padding=10)
-        wait_label.pack()
-        self.waiting_popup.config(borderwidth=2, relief="solid")
+            wait_label = ttk.Label(self.waiting_popup, text="Waiting for response..", padding=10)
+            wait_label.pack()
 
-        self.waiting_popup.update_idletasks() # Update to get correct window size
+            self.waiting_popup.update_idletasks() # Update to get correct window size
 
         # Get main window position and size
         main_window_width = self.root.winfo_width()
@@ -1168,53 +1691,75 @@ class AIChatApp:
         center_x = main_window_x + (main_window_width // 2) - (popup_width // 2)
         center_y = main_window_y + (main_window_height // 2) - (popup_height // 2)
 
-        # Set popup position
+        # Set popup position and show it
         self.waiting_popup.geometry(f"+{center_x}+{center_y}")
+        self.waiting_popup.deiconify()
 
-        wait_label.update()
-        self.waiting_popup.update()
-        self.root.update_idletasks() # Ensure main root is also updated
+    def _on_prompt_modified(self, event=None):
+        """Marks the prompt token count as stale when the prompt editor text changes."""
+        # Resetting the modified flag fires <<Modified>> again, so only react when the flag is set
+        if self.prompt_text_editor.edit_modified():
+            self._prompt_dirty = True
+            self.prompt_text_editor.edit_modified(False)
 
     def _update_prompt_token_count(self):
+        """
+        Schedules an update of the prompt token count label. Debounced: every call restarts a short timer,
+        so bursts of keystrokes, repeated Update Count clicks and conversation switches coalesce into one count.
+        """
+        if self._prompt_count_job:
+            self.root.after_cancel(self._prompt_count_job)
+        self._prompt_count_job = self.root.after(150, self._do_update_prompt_token_count)
+
+    def _do_update_prompt_token_count(self):
         """
         Calculates and updates the token count label for the prompt text editor.
-        Triggered by the Update Count button.
+        Runs from the timer scheduled by _update_prompt_token_count.
         """
+        self._prompt_count_job = None
         try:
             prompt_text = self.prompt_text_editor.get("1.0", tk.END).strip()
+            model_name = self.active_conversation.get_model_name() if self.active_conversation else None
 
             if not prompt_text:
                 self.prompt_token_count_var.set("Tokens: 0")
-                return
-
-            if self.active_conversation and self.active_conversation.OpenAI_chat_session.client:
-                client = self.active_conversation.OpenAI_chat_session.client
-                model_name = self.active_conversation.get_model_name()
+            elif self.active_conversation:
                 try:
-                    token_response = client.models.count_tokens(model=model_name, contents=prompt_text)
-                    token_count = token_response.total_tokens
+                    token_count = self._count_tokens_cached(self.active_conversation, prompt_text)
                     self.prompt_token_count_var.set(f"Tokens: {token_count}")
                 except Exception as e:
                     print(f"Error counting prompt tokens: {e}")
                     self.prompt_token_count_var.set("Tokens: Error")
+                    return # Keep the count marked stale
             else:
-                # No active conversation or client not available
+                # No active conversation
                 self.prompt_token_count_var.set("Tokens: N/A")
 
+            # The label now matches the current text and model
+            self._prompt_dirty = False
+            self._prompt_count_model = model_name
+
         except Exception as e:
             print(f"Unexpected error updating prompt token count: {e}")
             self.prompt_token_count_var.set("Tokens: Error")
 
     def _copy_message_text(self):
-        """Copies the content of the message_text display area to the clipboard."""
+        """
+        Copies the content of the message_text display area to the clipboard.
+        Very long texts are copied with the OS clipboard API on a worker thread so the UI doesn't stall
+        while Tk takes over the whole text.
+        """
         try:
             # Get text from the Text widget (works even if state is DISABLED)
             text_to_copy = self.message_text.get("1.0", tk.END).strip()
-            if text_to_copy:
-                self.root.clipboard_clear()  # Clear the clipboard first
-                self.root.clipboard_append(text_to_copy) # Append the text
-            else:
+            if not text_to_copy:
                 print("Nothing to copy.")
+            elif len(text_to_copy) >= _CLIPBOARD_NATIVE_MIN:
+                future = self._api_executor.submit(_set_clipboard_native, text_to_copy)
+                future.add_done_callback(
+                    lambda f: self._after_from_worker(0, self._on_native_copy_done, f, text_to_copy))
+            else:
+                self._set_clipboard_tk(text_to_copy)
         except tk.TclError:
             # This might happen if the clipboard is unavailable
             messagebox.showerror("Clipboard Error", "Could not access the system clipboard.")
@@ -1222,6 +1767,30 @@ class AIChatApp:
             print(f"Error copying message text: {e}")
             messagebox.showerror("Error", f"An unexpected error occurred during copy:\n{e}")
 
+    def _set_clipboard_tk(self, text):
+        """Puts text on the clipboard through Tk."""
+        self.root.clipboard_clear()  # Clear the clipboard first
+        self.root.clipboard_append(text) # Append the text
+
+    def _on_native_copy_done(self, future, text):
+        """
+        Handles the end of a clipboard copy started by _copy_message_text. Runs on the Tk thread.
+        Falls back to copying through Tk if no native clipboard tool was available or it failed.
+
+        Args:
+            future (concurrent.futures.Future): The future of the _set_clipboard_native call.
+            text (str): The text being copied.
+        """
+        try:
+            if future.result():
+                return
+        except Exception as e:
+            print(f"Native clipboard copy failed, copying through Tk: {e}")
+        try:
+            self._set_clipboard_tk(text)
+        except tk.TclError:
+            messagebox.showerror("Clipboard Error", "Could not access the system clipboard.")
+
 
 if __name__ == "__main__":
     root = tk.Tk()